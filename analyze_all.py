@@ -1,5 +1,7 @@
 import re
 
+from normalize import normalize, normalize_table
+
 
 class NganasanMorphAnalyzer:
     def __init__(self):
@@ -8,6 +10,13 @@ class NganasanMorphAnalyzer:
         self.load_verb_paradigms()
         self.load_pronoun_paradigms()
         self.load_numeral_paradigms()
+        self.normalize_paradigms()
+
+    def normalize_paradigms(self):
+        """Приведение всех таблиц к каноническому написанию (в таблицах смешаны ə и ә)."""
+        for name in ('noun_declensions', 'possession_suffixes', 'consonant_alternations',
+                     'verb_conjugations', 'tense_suffixes', 'moods', 'pronouns', 'numerals'):
+            setattr(self, name, normalize_table(getattr(self, name)))
 
     def load_noun_paradigms(self):
         """Загрузка парадигм склонения существительных."""
@@ -258,15 +267,15 @@ class NganasanMorphAnalyzer:
 
         for num in ['sg', 'dl', 'pl']:
             for pers in ['1', '2', '3']:
-                for suffix in self.possession_suffixes[num][pers]:
-                    if word.endswith(suffix):
-                        analysis['features'].update({
-                            'possession': 'yes',
-                            'possessor_num': num,
-                            'possessor_pers': pers
-                        })
-                        analysis['stem'] = word[:-len(suffix)]
-                        return analysis
+                suffix = self.possession_suffixes[num][pers]
+                if word.endswith(suffix):
+                    analysis['features'].update({
+                        'possession': 'yes',
+                        'possessor_num': num,
+                        'possessor_pers': pers
+                    })
+                    analysis['stem'] = word[:-len(suffix)]
+                    return analysis
 
         for decl in [1, 2, 3]:
             case_data = self.noun_declensions[decl]
@@ -300,7 +309,7 @@ class NganasanMorphAnalyzer:
         if stem.endswith(('"', 'м', 'н', 'р', 'й')):
             return 3
         # 1 склонение - основа на долгий гласный или дифтонг
-        elif re.search(r'(aa|ee|uu|yy|ai|au|ei|eu|oi|ou|ui|uu)$', stem):
+        elif re.search(r'(аа|ее|ии|оо|уу|ыы|ээ|ай|ау|ей|оу|уй|иэ|уо|ыа)$', stem):
             return 1
         # 2 склонение - остальные случаи
         else:
@@ -310,13 +319,13 @@ class NganasanMorphAnalyzer:
         """Определение притяжательных суффиксов."""
         for num in ['sg', 'dl', 'pl']:
             for pers in ['1', '2', '3']:
-                for suffix in self.possession_suffixes[num][pers]:
-                    if word.endswith(stem + suffix):
-                        return {
-                            'possession': 'yes',
-                            'possessor_num': num,
-                            'possessor_pers': pers
-                        }
+                suffix = self.possession_suffixes[num][pers]
+                if word.endswith(stem + suffix):
+                    return {
+                        'possession': 'yes',
+                        'possessor_num': num,
+                        'possessor_pers': pers
+                    }
         return None
 
     def detect_case(self, word, stem, declension, number):
@@ -609,41 +618,95 @@ class NganasanMorphAnalyzer:
         analysis['features']['type'] = 'unknown'
         return analysis
 
-    def analyze(self, word):
-        """Основной метод анализа слова."""
-        # Удаление вопросительного знака, если есть
-        clean_word = word.rstrip('?')
-
-        # Измененный порядок проверки частей речи:
-        # 1. Сначала проверяем числительные (они имеют четкие формы)
+    def _numeral_reading(self, clean_word):
+        """Разбор как числительное, если форма есть в таблицах."""
         num_analysis = self.analyze_numeral(clean_word)
         if num_analysis['features'].get('type') != 'unknown':
             return num_analysis
+        return None
 
-        # 2. Проверяем местоимения (они тоже имеют четкие формы)
+    def _pronoun_reading(self, clean_word):
+        """Разбор как местоимение, если форма есть в таблицах."""
         pron_analysis = self.analyze_pronoun(clean_word)
         if pron_analysis['features'].get('type') != 'unknown':
             return pron_analysis
+        return None
 
-        # 3. Проверяем существительные (более строгая проверка)
-        noun_analysis = self.analyze_noun(clean_word)
-        # Проверяем, есть ли признаки существительного
-        if ('case' in noun_analysis['features'] or
-                'number' in noun_analysis['features'] or
-                'declension' in noun_analysis['features']):
-            return noun_analysis
-
-        # 4. Только если не распознано как другие части речи, проверяем глагол
+    def _verb_reading(self, clean_word):
+        """Разбор как глагол, если найдены его признаки."""
         verb_analysis = self.analyze_verb(clean_word)
-        # Проверяем, есть ли признаки глагола
         if ('conjugation' in verb_analysis['features'] or
                 'tense' in verb_analysis['features'] or
                 'mood' in verb_analysis['features']):
             return verb_analysis
+        return None
+
+    @staticmethod
+    def _has_noun_features(noun_analysis):
+        """Есть ли у разбора признаки существительного."""
+        return ('case' in noun_analysis['features'] or
+                'number' in noun_analysis['features'] or
+                'declension' in noun_analysis['features'])
+
+    def _has_person_ending(self, clean_word):
+        """Есть ли непустое личное окончание, перед которым не один показатель времени (туо-м, но не ту-н)."""
+        tense_suffixes = {suffix for aspects in self.tense_suffixes.values() for suffix in aspects.values()}
+        for tense in ['pres', 'past', 'fut']:
+            for persons in self.verb_conjugations['subjective'][tense].values():
+                for ending in persons.values():
+                    if ending and clean_word.endswith(ending) and clean_word[:-len(ending)] not in tense_suffixes:
+                        return True
+        return False
+
+    def _verb_first(self, noun_analysis, clean_word):
+        """Перевешивает ли найденный глагол разбор как существительное."""
+        if noun_analysis.get('stem') == clean_word:
+            # nom.sg по умолчанию (суффикс не найден) - только против явного личного окончания
+            return self._has_person_ending(clean_word)
+        return not self._has_noun_features(noun_analysis)
+
+    def analyze(self, word):
+        """Основной метод анализа слова."""
+        # Каноническое написание и удаление вопросительного знака, если есть
+        clean_word = normalize(word).rstrip('?')
+
+        # Измененный порядок проверки частей речи:
+        # 1. Сначала проверяем числительные (они имеют четкие формы)
+        num_analysis = self._numeral_reading(clean_word)
+        if num_analysis:
+            return num_analysis
+
+        # 2. Проверяем местоимения (они тоже имеют четкие формы)
+        pron_analysis = self._pronoun_reading(clean_word)
+        if pron_analysis:
+            return pron_analysis
+
+        # 3. Проверяем существительные (более строгая проверка)
+        noun_analysis = self.analyze_noun(clean_word)
+
+        # 4. Глагол - если у существительного нет своих признаков или у глагола есть личное окончание
+        if self._verb_first(noun_analysis, clean_word):
+            verb_analysis = self._verb_reading(clean_word)
+            if verb_analysis:
+                return verb_analysis
 
         # 5. Если не распознано, возвращаем анализ как существительное (по умолчанию)
         return noun_analysis
 
+    def analyze_candidates(self, word):
+        """Все возможные разборы слова в порядке приоритета для analyze()."""
+        clean_word = normalize(word).rstrip('?')
+
+        # Существительное возможно всегда (по умолчанию nom.sg), остальные - если найдены
+        noun_analysis = self.analyze_noun(clean_word)
+        verb_analysis = self._verb_reading(clean_word)
+        if self._verb_first(noun_analysis, clean_word):
+            readings = (verb_analysis, noun_analysis)
+        else:
+            readings = (noun_analysis, verb_analysis)
+        readings = (self._numeral_reading(clean_word), self._pronoun_reading(clean_word), *readings)
+        return [reading for reading in readings if reading]
+
 
 if __name__ == "__main__":
     analyzer = NganasanMorphAnalyzer()
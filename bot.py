@@ -1,7 +1,15 @@
+import asyncio
 import logging
-from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+import os
+import tempfile
+from functools import lru_cache
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
+from telegram.ext import Application, CommandHandler, InlineQueryHandler, MessageHandler, filters
 from analyze_all import NganasanMorphAnalyzer
+from normalize import normalize
+from bulk import MAX_FILE_SIZE, OUTPUT_FORMATS, SUPPORTED_EXTENSIONS, analyze_file
+from prefix_index import PrefixIndex
+from metrics import Metrics
 
 
 logging.basicConfig(
@@ -10,10 +18,23 @@ logging.basicConfig(
 )
 
 
+# Сколько документов разбирается одновременно
+MAX_BULK_JOBS = 2
+
+# Как часто писать сводку метрик в лог, если HTTP-эндпоинт не включен (секунды)
+METRICS_DUMP_INTERVAL = 60
+
+
 class NganasanBot:
-    def __init__(self, token):
+    def __init__(self, token, metrics_port=None, sample_rate=1.0):
         self.token = token
+        self.metrics_port = metrics_port
+        self.metrics = Metrics(sample_rate=sample_rate)
+        self.bulk_jobs = asyncio.Semaphore(MAX_BULK_JOBS)
         self.analyzer = NganasanMorphAnalyzer()
+        self.prefix_index = PrefixIndex()
+        # Inline-запросы приходят на каждое нажатие клавиши - готовые ответы кэшируем по префиксу
+        self.inline_results = lru_cache(maxsize=4096)(self._inline_results)
 
     async def start(self, update: Update, context):
         """Обработчик команды /start"""
@@ -33,7 +54,9 @@ class NganasanBot:
             "- Существительные: таа, таагай, десьмё\n"
             "- Глаголы: ту\"ом, туйсузәм\n"
             "- Местоимения: мәне, нонәнте\n"
-            "- Числительные: ситти"
+            "- Числительные: ситти\n\n"
+            "3. Можно прислать документ .txt или .csv — бот вернет разбор всех слов "
+            "файлом TSV (или JSONL, если в подписи к файлу написать jsonl)"
         )
         await update.message.reply_text(help_text)
 
@@ -57,14 +80,126 @@ class NganasanBot:
         # Убираем вопросительный знак если есть
         clean_word = word.rstrip('?')
 
+        trace = self.metrics.trace('analyze_word', update.update_id)
+
+        error = None
         try:
-            analysis = self.analyzer.analyze(clean_word)
-            response = self.format_analysis(word, analysis)
+            with trace.span('analyze'):
+                analysis = self.analyzer.analyze(clean_word)
+            with trace.span('format_analysis'):
+                response = self.format_analysis(word, analysis)
         except Exception as e:
+            error = e
+            self.metrics.increment('analyze_word_errors')
             logging.error(f"Error analyzing {word}: {e}")
             response = f"⚠ Не удалось разобрать слово '{word}'\nОшибка: {str(e)}"
 
-        await update.message.reply_text(response)
+        try:
+            with trace.span('reply_text'):
+                await update.message.reply_text(response)
+        except Exception as e:
+            error = e
+            self.metrics.increment('analyze_word_errors')
+            raise
+        finally:
+            trace.finish(error)
+
+    async def analyze_document(self, update: Update, context):
+        """Обработчик документов: разбор всего файла в фоне"""
+        document = update.message.document
+        name = document.file_name or 'document.txt'
+        if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+            await update.message.reply_text("⚠ Поддерживаются только файлы .txt и .csv")
+            return
+        if document.file_size and document.file_size > MAX_FILE_SIZE:
+            await update.message.reply_text(
+                f"⚠ Файл слишком большой (максимум {MAX_FILE_SIZE // 1024 // 1024} МБ)"
+            )
+            return
+        if self.bulk_jobs.locked():
+            await update.message.reply_text("⏳ Сейчас разбирается слишком много файлов, попробуйте позже")
+            return
+
+        caption = (update.message.caption or '').strip().lower()
+        fmt = caption if caption in OUTPUT_FORMATS else 'tsv'
+
+        async with self.bulk_jobs:
+            status = await update.message.reply_text(f"📄 Файл {name} получен, начинаю разбор…")
+            loop = asyncio.get_running_loop()
+
+            def progress(done):
+                # Вызывается из рабочего потока - сообщение правим через цикл событий
+                asyncio.run_coroutine_threadsafe(
+                    status.edit_text(f"📄 {name}: разобрано {done:.0%}"), loop
+                )
+
+            with tempfile.TemporaryDirectory() as tmp:
+                in_path = os.path.join(tmp, os.path.basename(name))
+                out_path = os.path.join(tmp, f"{os.path.splitext(os.path.basename(name))[0]}.{fmt}")
+                try:
+                    file = await document.get_file()
+                    await file.download_to_drive(in_path)
+                    stats = await asyncio.to_thread(
+                        analyze_file, in_path, out_path, fmt, self.analyzer, progress
+                    )
+                except Exception as e:
+                    logging.error(f"Error analyzing document {name}: {e}")
+                    await update.message.reply_text(f"⚠ Не удалось разобрать файл '{name}'\nОшибка: {str(e)}")
+                    return
+
+                with open(out_path, 'rb') as f:
+                    await update.message.reply_document(
+                        f,
+                        filename=os.path.basename(out_path),
+                        caption=f"✅ Разобрано слов: {stats['tokens']} за {stats['seconds']:.1f} с"
+                    )
+
+    async def inline_query(self, update: Update, context):
+        """Обработчик inline-запросов: автодополнение известных словоформ"""
+        trace = self.metrics.trace('inline_query', update.update_id)
+
+        error = None
+        try:
+            prefix = normalize(update.inline_query.query.strip())
+            with trace.span('inline_results'):
+                results = self.inline_results(prefix)
+            with trace.span('answer'):
+                await update.inline_query.answer(results, cache_time=300)
+        except Exception as e:
+            error = e
+            self.metrics.increment('inline_query_errors')
+            raise
+        finally:
+            trace.finish(error)
+
+    def watch_arrivals(self, update_queue):
+        """Отметка прихода апдейта для этапа receive: в момент постановки в очередь update_queue"""
+        put = update_queue.put
+
+        async def put_and_mark(update):
+            if isinstance(update, Update):
+                self.metrics.mark_arrival(update.update_id)
+            await put(update)
+
+        update_queue.put = put_and_mark
+
+    def _inline_results(self, prefix):
+        results = []
+        for i, form in enumerate(self.prefix_index.complete(prefix)):
+            entry = self.prefix_index.entry(form)
+            description = f"{entry['pos']}, {entry['lemma']}"
+            if entry.get('translation'):
+                description += f" — {entry['translation']}"
+            # Разбор для сообщения - из той же записи словаря, что и описание карточки
+            analysis = {'pos': entry['pos'].upper(), 'stem': entry['lemma'], 'features': entry['tags']}
+            response = self.format_analysis(form, analysis)
+            results.append(InlineQueryResultArticle(
+                id=str(i),
+                title=form,
+                description=description,
+                input_message_content=InputTextMessageContent(response)
+            ))
+        return tuple(results)
 
     def format_analysis(self, word, analysis):
         pos = analysis.get('pos', 'UNKN')
@@ -107,15 +242,25 @@ class NganasanBot:
 
     def run(self):
         application = Application.builder().token(self.token).build()
+        # Updater и Application используют одну очередь - апдейт отмечается, как только получен от Telegram
+        self.watch_arrivals(application.update_queue)
         application.add_handler(CommandHandler("start", self.start))
         application.add_handler(CommandHandler("help", self.help_command))
         application.add_handler(CommandHandler("example", self.example_command))
         application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.analyze_word))
+        application.add_handler(MessageHandler(filters.Document.ALL, self.analyze_document))
+        application.add_handler(InlineQueryHandler(self.inline_query))
+        if self.metrics_port:
+            self.metrics.serve(self.metrics_port)
+        else:
+            self.metrics.dump_periodically(METRICS_DUMP_INTERVAL)
         application.run_polling()
 
 
 if __name__ == '__main__':
     BOT_TOKEN = "-"
+    METRICS_PORT = 9100  # http://127.0.0.1:9100/metrics
+    TRACE_SAMPLE_RATE = 0.1  # доля апдейтов, для которых пишутся трассы
 
-    bot = NganasanBot(BOT_TOKEN)
+    bot = NganasanBot(BOT_TOKEN, METRICS_PORT, TRACE_SAMPLE_RATE)
     bot.run()
@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from functools import lru_cache
+
+from analyze_all import NganasanMorphAnalyzer
+from normalize import normalize, tokenize
+
+
+# Ограничение Telegram Bot API на скачивание файлов ботом
+MAX_FILE_SIZE = 20 * 1024 * 1024
+SUPPORTED_EXTENSIONS = ('.txt', '.csv')
+OUTPUT_FORMATS = ('tsv', 'jsonl')
+
+
+def iter_tokens(text_file, is_csv=False, skip_header=True):
+    """Пары (номер строки, слово) из текстового или csv-файла (первая строка csv - заголовок)."""
+    if is_csv:
+        reader = csv.reader(text_file)
+        if skip_header:
+            next(reader, None)
+        for row in reader:
+            for cell in row:
+                for word in tokenize(cell):
+                    yield reader.line_num, word
+    else:
+        for line_no, line in enumerate(text_file, 1):
+            for word in tokenize(line):
+                yield line_no, word
+
+
+def format_features(features):
+    return ';'.join(f"{k}={v}" for k, v in features.items() if v not in ('', None))
+
+
+def analyze_file(in_path, out_path, fmt='tsv', analyzer=None, progress=None, cache_size=65536,
+                 skip_header=True):
+    """Потоковый разбор всех слов файла в TSV/JSONL; progress(доля) вызывается по ходу работы."""
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+
+    analyzer = analyzer or NganasanMorphAnalyzer()
+    # В транскриптах слова часто повторяются; ключ кэша - каноническое написание
+    analyze = lru_cache(maxsize=cache_size)(analyzer.analyze)
+
+    total = os.path.getsize(in_path) or 1
+    is_csv = in_path.lower().endswith('.csv')
+    n_tokens = 0
+    last_reported = 0.0
+    start = time.perf_counter()
+
+    with open(in_path, 'rb') as raw, open(out_path, 'w', encoding='utf-8', newline='') as out:
+        text = io.TextIOWrapper(raw, encoding='utf-8', errors='replace', newline='')
+        if fmt == 'tsv':
+            # Кавычка - гортанная смычка, она есть в большинстве форм, поэтому без кавычек-обрамлений
+            writer = csv.writer(out, delimiter='\t', lineterminator='\n',
+                                quoting=csv.QUOTE_NONE, quotechar=None, escapechar='\\')
+            writer.writerow(['line', 'word', 'pos', 'stem', 'features'])
+
+        for line_no, word in iter_tokens(text, is_csv, skip_header):
+            analysis = analyze(normalize(word))
+            if fmt == 'tsv':
+                writer.writerow([line_no, word, analysis.get('pos', 'UNKN'),
+                                 analysis.get('stem', ''), format_features(analysis.get('features', {}))])
+            else:
+                out.write(json.dumps({'line': line_no, 'word': word, 'analysis': analysis},
+                                     ensure_ascii=False))
+                out.write('\n')
+
+            n_tokens += 1
+            if progress and n_tokens % 10000 == 0:
+                done = raw.tell() / total
+                if done - last_reported >= 0.1:
+                    last_reported = done
+                    progress(min(done, 1.0))
+
+    elapsed = time.perf_counter() - start
+    if progress:
+        progress(1.0)
+    return {
+        'tokens': n_tokens,
+        'bytes': total,
+        'seconds': elapsed,
+        'cache': analyze.cache_info(),
+    }
+
+
+def make_sample_file(path, size_mb=5, seed=0, lexicon_path='words.json'):
+    """Тестовый «транскрипт» из словоформ словаря нужного размера."""
+    with open(lexicon_path, encoding='utf-8') as f:
+        forms = list(json.load(f))
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < target:
+            line = ' '.join(rng.choice(forms) for _ in range(rng.randint(3, 12))) + '.\n'
+            f.write(line)
+            written += len(line.encode('utf-8'))
+
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    analyzer = NganasanMorphAnalyzer()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = os.path.join(tmp, 'sample.txt')
+        make_sample_file(sample, size_mb)
+        for fmt in OUTPUT_FORMATS:
+            stats = analyze_file(sample, os.path.join(tmp, f'out.{fmt}'), fmt, analyzer)
+            mb = stats['bytes'] / 1024 / 1024
+            print(f"{fmt}: {mb:.1f} МБ, {stats['tokens']} слов за {stats['seconds']:.2f} с "
+                  f"({mb / stats['seconds']:.2f} МБ/с, {stats['tokens'] / stats['seconds']:.0f} слов/с)")
@@ -0,0 +1,311 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from analyze_all import NganasanMorphAnalyzer
+from normalize import normalize, tokenize
+
+
+POS_TAGS = ('NOUN', 'VERB', 'PRON', 'NUM', 'UNKN')
+
+# Признаки, которые есть и в words.json, и в разборах анализатора
+FEATURES = ('case', 'number', 'person', 'tense', 'type', 'subtype', 'declension', 'possession')
+
+BASELINE_PATH = 'eval_baseline.json'
+
+# Допустимое падение метрик относительно базовой линии
+TOLERANCE = 0.001
+
+# Варианты написания, которые должны разбираться так же, как каноническая форма
+SPELLING_VARIANTS = (
+    ('“таа”', 'таа'),
+    ('„ситти“', 'ситти'),
+    ('«ситти»', 'ситти'),
+    ('"таа"', 'таа'),
+    ('ту’ом', 'ту"ом'),
+    ('би’', 'би"'),
+    ('би”', 'би"'),
+    ('Ӈуо', 'ӈуо'),
+    ('СИТТИ', 'ситти'),
+    ('тaa', 'таа'),
+    ('мəне', 'мәне'),
+)
+
+
+def load_lexicon(path='words.json'):
+    """Эталон из словаря: [(форма, {'pos', 'lemma', 'tags'})]."""
+    with open(path, encoding='utf-8') as f:
+        lexicon = json.load(f)
+    return [(form, {'pos': entry['pos'].upper(), 'lemma': entry['lemma'], 'tags': entry['tags']})
+            for form, entry in lexicon.items()]
+
+
+def generate_paradigm_forms(lexicon, analyzer=None):
+    """Формы, построенные по таблицам парадигм для лемм словаря."""
+    analyzer = analyzer or NganasanMorphAnalyzer()
+    items = []
+
+    nouns = {}
+    verbs = set()
+    for form, gold in lexicon:
+        if gold['pos'] == 'NOUN' and 'declension' in gold['tags']:
+            nouns[gold['lemma']] = gold['tags']['declension']
+        elif gold['pos'] == 'VERB':
+            verbs.add(gold['lemma'])
+
+    for lemma, declension in nouns.items():
+        for case in ('dat', 'loc', 'abl', 'prol'):
+            for number, suffixes in analyzer.noun_declensions[declension][case].items():
+                for suffix in suffixes:
+                    items.append((lemma + suffix, {
+                        'pos': 'NOUN', 'lemma': lemma,
+                        'tags': {'case': case, 'number': number, 'declension': declension},
+                    }))
+        for number, persons in analyzer.possession_suffixes.items():
+            for person, suffix in persons.items():
+                items.append((lemma + suffix, {
+                    'pos': 'NOUN', 'lemma': lemma,
+                    'tags': {'case': 'nom', 'number': 'sg', 'possession': person + number,
+                             'declension': declension},
+                }))
+
+    for lemma in verbs:
+        for tense, aspects in analyzer.tense_suffixes.items():
+            stem = lemma + aspects['dur']
+            for number, persons in analyzer.verb_conjugations['subjective'][tense].items():
+                for person, ending in persons.items():
+                    items.append((stem + ending, {
+                        'pos': 'VERB', 'lemma': lemma,
+                        'tags': {'tense': tense, 'person': person, 'number': number},
+                    }))
+
+    for pron_type in ('personal', 'reflexive'):
+        for number, persons in analyzer.pronouns[pron_type].items():
+            for person, form in persons.items():
+                items.append((form, {
+                    'pos': 'PRON', 'lemma': form,
+                    'tags': {'type': pron_type, 'person': person, 'number': number},
+                }))
+
+    for num_type in ('cardinal', 'ordinal'):
+        for form in analyzer.numerals[num_type].values():
+            items.append((form, {'pos': 'NUM', 'lemma': form, 'tags': {'type': num_type}}))
+
+    # Формы, уже размеченные в словаре, и омонимичные формы не дублируем
+    known = {normalize(form) for form, _ in lexicon}
+    result = []
+    for form, gold in items:
+        key = normalize(form)
+        if key not in known:
+            known.add(key)
+            result.append((form, gold))
+    return result
+
+
+def predicted_features(analysis):
+    """Признаки разбора в терминах words.json."""
+    features = dict(analysis.get('features', {}))
+    if features.pop('possession', None) == 'yes':
+        features['possession'] = f"{features.pop('possessor_pers', '')}{features.pop('possessor_num', '')}"
+    return {k: str(v) for k, v in features.items() if k in FEATURES and v not in ('', None)}
+
+
+_analyzer = None
+
+
+def _init_worker():
+    global _analyzer
+    _analyzer = NganasanMorphAnalyzer()
+
+
+def _evaluate_chunk(items):
+    """Частичная статистика по куску эталона (выполняется в отдельном процессе)."""
+    analyzer = _analyzer or NganasanMorphAnalyzer()
+    stats = {'confusion': Counter(), 'tp': Counter(), 'fp': Counter(), 'fn': Counter(),
+             'lemma': 0, 'pos_correct': [], 'n': 0}
+
+    for form, gold in items:
+        analysis = analyzer.analyze(form)
+        pos = analysis.get('pos', 'UNKN')
+        stats['n'] += 1
+        stats['confusion'][(gold['pos'], pos)] += 1
+        if pos == gold['pos']:
+            stats['pos_correct'].append(form)
+
+        stem = analysis.get('stem', normalize(form).rstrip('?'))
+        if normalize(stem) == normalize(gold['lemma']):
+            stats['lemma'] += 1
+
+        gold_features = {k: str(v) for k, v in gold['tags'].items() if k in FEATURES}
+        pred = predicted_features(analysis)
+        for key in FEATURES:
+            if key in pred and pred[key] == gold_features.get(key):
+                stats['tp'][key] += 1
+            else:
+                if key in pred:
+                    stats['fp'][key] += 1
+                if key in gold_features:
+                    stats['fn'][key] += 1
+    return stats
+
+
+def evaluate(items, workers=None, chunk_size=None):
+    """Прогон анализатора по эталону параллельно в нескольких процессах."""
+    workers = workers or os.cpu_count() or 1
+    # По несколько кусков на процесс, чтобы пул был загружен равномерно
+    chunk_size = chunk_size or max(1, len(items) // (workers * 4))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        parts = [_evaluate_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+            parts = list(pool.map(_evaluate_chunk, chunks))
+
+    total = {'confusion': Counter(), 'tp': Counter(), 'fp': Counter(), 'fn': Counter(),
+             'lemma': 0, 'pos_correct': [], 'n': 0}
+    for part in parts:
+        for key in ('confusion', 'tp', 'fp', 'fn'):
+            total[key].update(part[key])
+        total['lemma'] += part['lemma']
+        total['pos_correct'].extend(part['pos_correct'])
+        total['n'] += part['n']
+    return summarize(total)
+
+
+def summarize(stats):
+    n = stats['n'] or 1
+    features = {}
+    for key in FEATURES:
+        tp, fp, fn = stats['tp'][key], stats['fp'][key], stats['fn'][key]
+        if tp + fp + fn == 0:
+            continue
+        features[key] = {
+            'precision': tp / (tp + fp) if tp + fp else 0.0,
+            'recall': tp / (tp + fn) if tp + fn else 0.0,
+            'support': tp + fn,
+        }
+    pos_correct = sum(v for (g, p), v in stats['confusion'].items() if g == p)
+    return {
+        'n': stats['n'],
+        'pos_accuracy': pos_correct / n,
+        'lemma_accuracy': stats['lemma'] / n,
+        'features': features,
+        'confusion': {f'{g}>{p}': v for (g, p), v in sorted(stats['confusion'].items())},
+        'pos_correct': sorted(stats['pos_correct']),
+    }
+
+
+def format_report(name, result):
+    lines = [f"== {name}: {result['n']} форм ==",
+             f"Точность части речи: {result['pos_accuracy']:.3f}",
+             f"Совпадение основы с леммой: {result['lemma_accuracy']:.3f}",
+             "",
+             f"{'признак':<12}{'precision':>10}{'recall':>10}{'support':>10}"]
+    for key, m in result['features'].items():
+        lines.append(f"{key:<12}{m['precision']:>10.3f}{m['recall']:>10.3f}{m['support']:>10}")
+
+    lines += ["", "Матрица ошибок (строки - эталон, столбцы - анализатор):",
+              f"{'':<6}" + ''.join(f"{p:>6}" for p in POS_TAGS)]
+    for gold in POS_TAGS:
+        row = [result['confusion'].get(f'{gold}>{pred}', 0) for pred in POS_TAGS]
+        if any(row):
+            lines.append(f"{gold:<6}" + ''.join(f"{v:>6}" for v in row))
+    return '\n'.join(lines)
+
+
+def check_spelling_variants(analyzer=None):
+    """Кавычки, регистр и смешанное письмо не должны менять разбор."""
+    analyzer = analyzer or NganasanMorphAnalyzer()
+    problems = []
+    for variant, canonical in SPELLING_VARIANTS:
+        expected = analyzer.analyze(canonical)
+        # Вариант проходит и через токенизатор (как в документах), и напрямую (как в сообщении)
+        tokens = tokenize(variant)
+        if len(tokens) != 1:
+            problems.append(f"{variant}: токенизатор вернул {tokens}")
+            continue
+        for word in dict.fromkeys((variant, tokens[0])):
+            got = analyzer.analyze(word)
+            if got != expected:
+                problems.append(f"{word}: {got['pos']} {got.get('features')} вместо {expected['pos']} "
+                                f"{expected.get('features')} ({canonical})")
+    if normalize('bad') != 'bad':
+        problems.append("латинское слово 'bad' изменено нормализацией")
+    return problems
+
+
+def find_regressions(results, baseline):
+    """Падения метрик и формы, которые раньше разбирались верно, а теперь нет."""
+    problems = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        for metric in ('pos_accuracy', 'lemma_accuracy'):
+            if result[metric] < old[metric] - TOLERANCE:
+                problems.append(f"{name}.{metric}: {old[metric]:.3f} -> {result[metric]:.3f}")
+        for key, m in old['features'].items():
+            new = result['features'].get(key, {'precision': 0.0, 'recall': 0.0})
+            for metric in ('precision', 'recall'):
+                if new[metric] < m[metric] - TOLERANCE:
+                    problems.append(f"{name}.{key}.{metric}: {m[metric]:.3f} -> {new[metric]:.3f}")
+        broken = sorted(set(old['pos_correct']) - set(result['pos_correct']))
+        if broken:
+            problems.append(f"{name}: неверная часть речи у {len(broken)} форм, например {', '.join(broken[:10])}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Проверка анализатора по words.json и сгенерированным парадигмам")
+    parser.add_argument('--lexicon', default='words.json')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help="сохранить текущие результаты как базовую линию")
+    parser.add_argument('--workers', type=int, default=None, help="число процессов (по умолчанию - по числу ядер)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    lexicon = load_lexicon(args.lexicon)
+    datasets = {'lexicon': lexicon, 'paradigms': generate_paradigm_forms(lexicon)}
+    results = {name: evaluate(items, args.workers) for name, items in datasets.items()}
+    elapsed = time.perf_counter() - start
+
+    for name, result in results.items():
+        print(format_report(name, result))
+        print()
+    print(f"Время: {elapsed:.2f} с")
+
+    spelling = check_spelling_variants()
+    if spelling:
+        print("\n⚠ Варианты написания разбираются иначе, чем каноническая форма:")
+        for problem in spelling:
+            print(f"  {problem}")
+        return 1
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Базовая линия сохранена в {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Базовой линии нет, запустите с --update-baseline")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    problems = find_regressions(results, baseline)
+    if problems:
+        print("\n⚠ Регрессии относительно базовой линии:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("Регрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Границы корзин гистограмм задержек, секунды
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+# Сколько отметок о приходе апдейтов хранить (для апдейтов без трассы они вытесняются)
+MAX_PENDING_ARRIVALS = 10000
+
+trace_logger = logging.getLogger('trace')
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами (как в Prometheus)."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Оценка квантиля по верхней границе корзины."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return BUCKETS[-1]
+
+
+class Trace:
+    """Замеры этапов обработки одного апдейта."""
+
+    def __init__(self, metrics, name, update_id=None):
+        self.metrics = metrics
+        self.name = name
+        self.update_id = update_id
+        self.spans = {}
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] = time.perf_counter() - start
+
+    def add(self, name, seconds):
+        """Этап, измеренный снаружи (например, задержка доставки апдейта)."""
+        self.spans[name] = max(seconds, 0.0)
+
+    def finish(self, error=None):
+        total = time.perf_counter() - self.start
+        self.metrics.record(self.name, self.spans, total)
+
+        record = {
+            'handler': self.name,
+            'update_id': self.update_id,
+            'total_ms': round(total * 1000, 3),
+            'spans_ms': {k: round(v * 1000, 3) for k, v in self.spans.items()},
+        }
+        if error:
+            record['error'] = str(error)
+        level = logging.WARNING if total >= self.metrics.slow_threshold else logging.DEBUG
+        if trace_logger.isEnabledFor(level):
+            trace_logger.log(level, json.dumps(record, ensure_ascii=False))
+
+
+class NullTrace:
+    """Заглушка для апдейтов, не попавших в выборку."""
+
+    def span(self, name):
+        return nullcontext()
+
+    def add(self, name, seconds):
+        pass
+
+    def finish(self, error=None):
+        pass
+
+
+class Metrics:
+    """Гистограммы задержек по этапам, счетчики и их выдача (HTTP /metrics или периодически в лог)."""
+
+    def __init__(self, sample_rate=1.0, slow_threshold=1.0):
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.counters = Counter()
+        self.histograms = {}
+        self.started = time.time()
+        self._arrivals = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark_arrival(self, update_id):
+        """Момент, когда апдейт получен от Telegram и поставлен в очередь (до обработчиков)."""
+        with self._lock:
+            self._arrivals[update_id] = time.perf_counter()
+            if len(self._arrivals) > MAX_PENDING_ARRIVALS:
+                self._arrivals.popitem(last=False)
+
+    def trace(self, name, update_id=None):
+        """Новая трасса; счетчики ведутся всегда, этапы - только для выборки."""
+        with self._lock:
+            self.counters[f'{name}_total'] += 1
+            arrival = self._arrivals.pop(update_id, None)
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return NullTrace()
+        trace = Trace(self, name, update_id)
+        if arrival is not None:
+            # От постановки апдейта в очередь до начала обработчика
+            trace.add('receive', trace.start - arrival)
+        return trace
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def record(self, handler, spans, total):
+        with self._lock:
+            for span, seconds in (*spans.items(), ('total', total)):
+                key = (handler, span)
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram()
+                histogram.observe(seconds)
+
+    def render(self):
+        """Текстовый формат Prometheus."""
+        lines = []
+        with self._lock:
+            uptime = max(time.time() - self.started, 1e-9)
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'bot_{name} {value}')
+                if name.endswith('_total'):
+                    lines.append(f'bot_{name[:-len("_total")]}_per_second {value / uptime:.3f}')
+            lines.append('# TYPE bot_latency_seconds histogram')
+            for (handler, span), histogram in sorted(self.histograms.items()):
+                labels = f'handler="{handler}",span="{span}"'
+                cumulative = 0
+                for bound, n in zip(BUCKETS, histogram.counts):
+                    cumulative += n
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'bot_latency_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'bot_latency_seconds_sum{{{labels}}} {histogram.sum:.6f}')
+                lines.append(f'bot_latency_seconds_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """Краткая сводка: p50/p99 по каждому этапу."""
+        with self._lock:
+            return {
+                f'{handler}.{span}': {
+                    'count': h.count,
+                    'p50_ms': h.quantile(0.5) * 1000,
+                    'p99_ms': h.quantile(0.99) * 1000,
+                }
+                for (handler, span), h in sorted(self.histograms.items())
+            }
+
+    def serve(self, port, host='127.0.0.1'):
+        """Локальный HTTP-эндпоинт /metrics в фоновом потоке."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def dump_periodically(self, interval=60.0):
+        """Сводка в лог раз в interval секунд (когда HTTP-эндпоинт не нужен)."""
+        def loop():
+            while True:
+                time.sleep(interval)
+                logging.info(f"metrics: {json.dumps(self.summary())}")
+
+        threading.Thread(target=loop, daemon=True).start()
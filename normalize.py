@@ -0,0 +1,172 @@
+import json
+import random
+import re
+import timeit
+from functools import lru_cache
+
+
+GLOTTAL_STOP = '"'
+
+# Заглавные кириллические -> строчные (весь блок U+0400-U+04FF, включая Ӈ, Ә, Ў)
+_CASE = {ch: ch.lower() for ch in map(chr, range(0x0400, 0x0500))
+         if ch.lower() != ch and len(ch.lower()) == 1}
+
+# Латинские буквы, которые выглядят как кириллические (смешанное письмо)
+_HOMOGLYPHS = {
+    'a': 'а', 'c': 'с', 'e': 'е', 'k': 'к', 'o': 'о', 'p': 'р', 'x': 'х', 'y': 'у',
+    'A': 'а', 'B': 'в', 'C': 'с', 'E': 'е', 'H': 'н', 'K': 'к', 'M': 'м',
+    'O': 'о', 'P': 'р', 'T': 'т', 'X': 'х', 'Y': 'у',
+}
+
+_VARIANTS = {
+    # шва: латинская ə -> кириллическая ә (э - отдельная фонема, не сливаем)
+    'ə': 'ә', 'Ə': 'ә',
+    # краткое у
+    'ŭ': 'ў', 'Ŭ': 'ў',
+}
+
+# Применяется только к словам, в которых уже есть кириллица
+TRANSLATION_TABLE = str.maketrans({**_CASE, **_HOMOGLYPHS, **_VARIANTS})
+
+# Кавычки, которыми не пишут гортанную смычку - в конце слова снимаются всегда
+QUOTATION_MARKS = '‹›«»'
+# Знаки, которыми пишут гортанную смычку (после буквы внутри слова -> ")
+GLOTTAL_VARIANTS = '“”„‟‘’\'`ʼˮʔ″'
+
+_CYRILLIC_RE = re.compile('[Ѐ-ӿ]')
+_GLOTTAL_RE = re.compile(f'(?<=[^\\W\\d_])[{GLOTTAL_VARIANTS}]')
+
+TOKEN_RE = re.compile(r'[^\s.,!;:()«»]+')
+
+
+def strip_quotes(word):
+    """Снятие кавычек, которыми слово обрамлено (гортанная смычка в конце слова остается)."""
+    # Гортанная смычка не бывает в начале слова - все кавычки в начале снимаем
+    stripped = word.lstrip(GLOTTAL_VARIANTS + GLOTTAL_STOP + '«‹')
+    opened = len(word) - len(stripped)
+    while opened and stripped[-1:] in tuple(GLOTTAL_VARIANTS + GLOTTAL_STOP + '»›'):
+        # Каждая открывающая кавычка закрывается одним знаком в конце
+        stripped = stripped[:-1]
+        opened -= 1
+    # Остальные ” и ’ в конце - гортанная смычка (би” -> би"), их заменит fold
+    return stripped.rstrip(QUOTATION_MARKS)
+
+
+def fold(text):
+    """Посимвольная нормализация: знаки смычки после буквы, регистр и латинские двойники."""
+    if not text.isalpha():
+        text = _GLOTTAL_RE.sub(GLOTTAL_STOP, text)
+    if text.isascii() or not _CYRILLIC_RE.search(text):
+        # Целиком латинские слова не трогаем, чтобы не получить смешанное письмо
+        return text
+    return text.translate(TRANSLATION_TABLE)
+
+
+def normalize(word):
+    """Каноническое написание слова (для обычных слов - один проход str.translate)."""
+    if not word.isalpha():
+        word = strip_quotes(word)
+    return fold(word)
+
+
+def tokenize(text):
+    """Разбиение текста на слова (кавычка - гортанная смычка, остается в слове, обрамления снимаются)."""
+    return [word for word in map(strip_quotes, TOKEN_RE.findall(text)) if word]
+
+
+def normalize_table(data):
+    """Нормализация всех строк во вложенных словарях/списках парадигм (ключи не меняются)."""
+    if isinstance(data, str):
+        # Суффиксы могут начинаться со смычки ("а), поэтому края не снимаем
+        return fold(data)
+    if isinstance(data, dict):
+        return {key: normalize_table(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [normalize_table(value) for value in data]
+    return data
+
+
+def make_variants(word, rng):
+    """Случайное «неканоническое» написание слова (для замеров)."""
+    inverse = {}
+    for source, target in {**_HOMOGLYPHS, **_VARIANTS}.items():
+        inverse.setdefault(target, []).append(source)
+    inverse[GLOTTAL_STOP] = list('’\'ʼ')
+    chars = []
+    for ch in word:
+        if ch in inverse and rng.random() < 0.5:
+            ch = rng.choice(inverse[ch])
+        elif rng.random() < 0.1:
+            ch = ch.upper()
+        chars.append(ch)
+    return ''.join(chars)
+
+
+def count_changed(data):
+    """Число строк во вложенных таблицах и сколько из них меняет нормализация."""
+    if isinstance(data, str):
+        return 1, int(fold(data) != data)
+    if isinstance(data, dict):
+        data = data.values()
+    elif not isinstance(data, (list, tuple)):
+        return 0, 0
+    total = changed = 0
+    for value in data:
+        t, c = count_changed(value)
+        total += t
+        changed += c
+    return total, changed
+
+
+if __name__ == "__main__":
+    from analyze_all import NganasanMorphAnalyzer
+
+    with open('words.json', encoding='utf-8') as f:
+        lexicon = json.load(f)
+    forms = list(lexicon)
+
+    # Реальные варианты написания есть в самих таблицах парадигм (латинская ə среди кириллицы)
+    analyzer = NganasanMorphAnalyzer()
+    raw = NganasanMorphAnalyzer()
+    raw.load_noun_paradigms()
+    raw.load_verb_paradigms()
+    raw.load_pronoun_paradigms()
+    raw.load_numeral_paradigms()
+    total = changed = 0
+    for name in ('noun_declensions', 'possession_suffixes', 'verb_conjugations',
+                 'tense_suffixes', 'moods', 'pronouns', 'numerals'):
+        t, c = count_changed(getattr(raw, name))
+        total += t
+        changed += c
+    print(f"Строк в таблицах парадигм: {total}, изменено нормализацией: {changed}")
+
+    # Формы words.json и примеры из бота, чей разбор зависит от нормализации таблиц
+    words = forms + ['туйсузәм', 'мәне', 'нонәнте', 'ту"ом']
+    differ = [w for w in words if analyzer.analyze(w) != raw.analyze(w)]
+    print(f"Форм, чей разбор меняется от нормализации таблиц: {len(differ)} из {len(words)}"
+          + (f" ({', '.join(differ[:10])})" if differ else ""))
+
+    n = 10
+    sample = forms * 100
+    per_token = timeit.timeit(lambda: [normalize(w) for w in sample], number=n) / n / len(sample)
+    print(f"normalize: {per_token * 1e9:.0f} нс на слово словаря")
+
+    rng = random.Random(0)
+    stream = [make_variants(rng.choice(forms), rng) for _ in range(100000)]
+    per_token = timeit.timeit(lambda: [normalize(w) for w in stream], number=n) / n / len(stream)
+    print(f"normalize: {per_token * 1e9:.0f} нс на слово с вариантами написания")
+
+    # Варианты построены обращением той же таблицы, поэтому результат - верхняя граница
+    # выигрыша, а не оценка на реальных текстах
+    print("Синтетические варианты (верхняя граница):")
+    raw_hits = sum(w in lexicon for w in stream) / len(stream)
+    canonical = {normalize(form) for form in forms}
+    norm_hits = sum(normalize(w) in canonical for w in stream) / len(stream)
+    print(f"  попадания в словарь: без нормализации {raw_hits:.1%}, с нормализацией {norm_hits:.1%}")
+
+    for name, key in (('без нормализации', lambda w: w), ('с нормализацией', normalize)):
+        cached = lru_cache(maxsize=4096)(analyzer.analyze)
+        for w in stream:
+            cached(key(w))
+        info = cached.cache_info()
+        print(f"  кэш разборов {name}: {info.hits / (info.hits + info.misses):.1%} попаданий")
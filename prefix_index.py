@@ -0,0 +1,168 @@
+import json
+import random
+import sys
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from normalize import normalize
+
+
+class PrefixIndex:
+    """Поиск словоформ и лемм из words.json по началу слова (отсортированный массив + bisect)."""
+
+    def __init__(self, path='words.json', limit=20, cache_size=4096):
+        with open(path, encoding='utf-8') as f:
+            self.lexicon = json.load(f)
+        self.limit = limit
+
+        # ключ (форма или лемма) -> словоформы, которые по нему находятся
+        forms_by_key = {}
+        for form, entry in self.lexicon.items():
+            key = normalize(form)
+            forms_by_key.setdefault(key, []).append(form)
+            lemma = entry.get('lemma')
+            if lemma and normalize(lemma) != key:
+                forms_by_key.setdefault(normalize(lemma), []).append(form)
+
+        self.keys = sorted(forms_by_key)
+        self.forms = [tuple(forms_by_key[key]) for key in self.keys]
+
+        self._cached_complete = lru_cache(maxsize=cache_size)(self._complete)
+
+    def complete(self, prefix):
+        """Словоформы, у которых форма или лемма начинается с prefix (в любом написании)."""
+        return self._cached_complete(normalize(prefix))
+
+    def _complete(self, prefix):
+        """Словоформы, у которых форма или лемма начинается с prefix."""
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + '\U0010ffff', lo=start)
+
+        result = []
+        seen = set()
+        for i in range(start, end):
+            for form in self.forms[i]:
+                if form not in seen:
+                    seen.add(form)
+                    result.append(form)
+                    if len(result) >= self.limit:
+                        return tuple(result)
+        return tuple(result)
+
+    def entry(self, form):
+        """Запись словаря для словоформы."""
+        return self.lexicon.get(form)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def make_queries(index, n_misses=20000, seed=0):
+    """Префиксы с ответами (все префиксы ключей индекса) и опечатки без ответов (префикс + лишние буквы)."""
+    hits = sorted({key[:i] for key in index.keys for i in range(1, len(key) + 1)})
+    alphabet = sorted({ch for key in index.keys for ch in key})
+    rng = random.Random(seed)
+    misses = set()
+    while len(misses) < n_misses:
+        prefix = rng.choice(hits) + ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 3)))
+        if not index.complete(prefix):
+            misses.add(prefix)
+    misses = sorted(misses)
+    rng.shuffle(hits)
+    rng.shuffle(misses)
+    return hits, misses
+
+
+def run_concurrent(fn, queries, workers):
+    """Задержка каждого вызова fn(запрос) при параллельной нагрузке из workers потоков."""
+    def run(chunk):
+        latencies = []
+        for prefix in chunk:
+            start = time.perf_counter()
+            fn(prefix)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    chunks = [queries[i::workers] for i in range(workers)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        latencies = [x for part in pool.map(run, chunks) for x in part]
+    elapsed = time.perf_counter() - start
+
+    return {
+        'queries': len(queries),
+        'qps': len(queries) / elapsed,
+        'p50_us': percentile(latencies, 0.50) * 1e6,
+        'p99_us': percentile(latencies, 0.99) * 1e6,
+        'max_us': max(latencies) * 1e6,
+    }
+
+
+def benchmark(bot, workers=16, n_misses=20000, n_warm=200000, miss_share=0.1, cold_rounds=20, seed=0):
+    """Задержка полного пути inline-запроса (поиск + разбор + сборка ответов) без кэша и с кэшем."""
+    def clear():
+        bot.inline_results.cache_clear()
+        bot.prefix_index._cached_complete.cache_clear()
+
+    def query(prefix):
+        return bot.inline_results(normalize(prefix))
+
+    def uncached(prefix):
+        return bot._inline_results(normalize(prefix))
+
+    index = bot.prefix_index
+    hits, misses = make_queries(index, n_misses, seed)
+    full = [prefix for prefix in hits if len(index.complete(prefix)) >= index.limit]
+    maxsize = bot.inline_results.cache_info().maxsize
+    rng = random.Random(seed)
+
+    # Без кэша: префиксы с ответами, оба кэша в обход (отдельно - префиксы, упирающиеся в лимит ответов)
+    cached_complete = index._cached_complete
+    index._cached_complete = index._complete
+    try:
+        cold = run_concurrent(uncached, hits * cold_rounds, workers)
+        cold_full = run_concurrent(uncached, [rng.choice(full) for _ in range(len(hits) * cold_rounds)], workers)
+    finally:
+        index._cached_complete = cached_complete
+
+    # Теплый кэш: поток запросов по префиксам с ответами, которые уже в кэше
+    hot = hits[:maxsize]
+    warm_queries = [rng.choice(hot) for _ in range(n_warm)]
+    clear()
+    for prefix in hot:
+        query(prefix)
+    warm = run_concurrent(query, warm_queries, workers)
+
+    # Смешанный поток: в основном префиксы с ответами, среди опечаток различных префиксов больше, чем мест в кэше
+    mixed_queries = [rng.choice(misses) if rng.random() < miss_share else rng.choice(hits)
+                     for _ in range(n_warm)]
+    clear()
+    mixed = run_concurrent(query, mixed_queries, workers)
+    info = bot.inline_results.cache_info()
+    mixed['hit_rate'] = info.hits / (info.hits + info.misses)
+
+    return {'hits': len(hits), 'full': len(full), 'misses': len(misses), 'cache_size': maxsize,
+            'miss_share': miss_share, 'cold': cold, 'cold_full': cold_full, 'warm': warm, 'mixed': mixed}
+
+
+if __name__ == "__main__":
+    from bot import NganasanBot
+
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    bot = NganasanBot('-')
+    stats = benchmark(bot, workers=workers)
+    print(f"Ключей в индексе: {len(bot.prefix_index.keys)}, префиксов с ответами: {stats['hits']} "
+          f"(из них {stats['full']} с {bot.prefix_index.limit} ответами), опечаток: {stats['misses']}, "
+          f"размер кэша: {stats['cache_size']}, потоков: {workers}")
+    for name, title in (('cold', 'без кэша'), ('cold_full', 'без кэша, полный ответ'),
+                        ('warm', 'из кэша'), ('mixed', f"смешанный ({stats['miss_share']:.0%} опечаток)")):
+        r = stats[name]
+        line = (f"{title:<30} запросов: {r['queries']:>6}, {r['qps']:>8.0f} запросов/с, "
+                f"p50: {r['p50_us']:>8.1f} мкс, p99: {r['p99_us']:>8.1f} мкс, max: {r['max_us']:>9.1f} мкс")
+        if 'hit_rate' in r:
+            line += f", попаданий в кэш: {r['hit_rate']:.1%}"
+        print(line)
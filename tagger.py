@@ -0,0 +1,280 @@
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from analyze_all import NganasanMorphAnalyzer
+from normalize import normalize
+
+
+# Части речи, которые возвращает анализатор
+TAGS = ('NOUN', 'VERB', 'PRON', 'NUM', 'UNKN')
+
+# Вместо -inf, чтобы не получать nan при сложении
+NEG_INF = -1e9
+
+def load_tagged_corpus(path):
+    """Загрузка размеченного корпуса: одно предложение в строке, токены вида слово/TAG."""
+    sentences = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            sentence = []
+            for token in line.split():
+                word, _, tag = token.rpartition('/')
+                if word and tag in TAGS:
+                    sentence.append((word, tag))
+            if sentence:
+                sentences.append(sentence)
+    return sentences
+
+
+class HMMTagger:
+    """Снятие частеречной омонимии на уровне предложения (HMM + Витерби)."""
+
+    def __init__(self, analyzer=None, smoothing=1.0):
+        self.analyzer = analyzer or NganasanMorphAnalyzer()
+        self.smoothing = smoothing
+        self.tag_index = {tag: i for i, tag in enumerate(TAGS)}
+
+        n_tags = len(TAGS)
+        self.start_counts = np.zeros(n_tags)
+        self.trans_counts = np.zeros((n_tags, n_tags))
+        self.emission_counts = {}  # слово -> счетчики по тегам
+        self.tag_totals = np.zeros(n_tags)
+
+        self._params = None
+        self._emission_cache = {}
+        self._candidates_cache = {}
+
+    def seed_from_lexicon(self, path='words.json', words=None):
+        """Начальные счетчики эмиссий из словаря форм."""
+        with open(path, encoding='utf-8') as f:
+            lexicon = json.load(f)
+
+        for form, entry in lexicon.items():
+            if words is not None and form not in words:
+                continue
+            tag = entry['pos'].upper()
+            if tag in self.tag_index:
+                self._add_emission(form, tag)
+        self._invalidate()
+
+    def train(self, sentences):
+        """Обучение на размеченных предложениях [(слово, тег), ...]."""
+        for sentence in sentences:
+            prev = None
+            for word, tag in sentence:
+                i = self.tag_index[tag]
+                if prev is None:
+                    self.start_counts[i] += 1
+                else:
+                    self.trans_counts[prev, i] += 1
+                self._add_emission(word, tag)
+                prev = i
+        self._invalidate()
+
+    def _add_emission(self, word, tag):
+        word = normalize(word).rstrip('?')
+        counts = self.emission_counts.get(word)
+        if counts is None:
+            counts = self.emission_counts[word] = np.zeros(len(TAGS))
+        i = self.tag_index[tag]
+        counts[i] += 1
+        self.tag_totals[i] += 1
+
+    def _invalidate(self):
+        self._params = None
+        self._emission_cache.clear()
+
+    def _log_params(self):
+        if self._params is None:
+            alpha = self.smoothing
+            start = self.start_counts + alpha
+            trans = self.trans_counts + alpha
+            log_start = np.log(start / start.sum())
+            log_trans = np.log(trans / trans.sum(axis=1, keepdims=True))
+            self._params = (log_start, log_trans)
+        return self._params
+
+    def is_known(self, word):
+        """Встречалась ли форма в словаре или обучающих данных."""
+        return normalize(word).rstrip('?') in self.emission_counts
+
+    def candidates(self, word):
+        """Разборы анализатора для слова (с кэшем)."""
+        result = self._candidates_cache.get(word)
+        if result is None:
+            result = self._candidates_cache[word] = self.analyzer.analyze_candidates(word)
+        return result
+
+    def emission(self, word):
+        """Логарифмы P(слово | тег); теги вне разборов анализатора и словаря запрещены."""
+        row = self._emission_cache.get(word)
+        if row is not None:
+            return row
+
+        clean_word = normalize(word).rstrip('?')
+        allowed = np.zeros(len(TAGS), dtype=bool)
+        for analysis in self.candidates(clean_word):
+            allowed[self.tag_index[analysis['pos']]] = True
+        counts = self.emission_counts.get(clean_word)
+        if counts is not None:
+            allowed |= counts > 0
+        else:
+            counts = np.zeros(len(TAGS))
+
+        vocab_size = len(self.emission_counts) + 1
+        probs = (counts + self.smoothing) / (self.tag_totals + self.smoothing * vocab_size)
+        row = np.where(allowed, np.log(probs), NEG_INF)
+        self._emission_cache[word] = row
+        return row
+
+    def viterbi_batch(self, sentences):
+        """Декодирование Витерби сразу для пачки предложений (списков слов)."""
+        if not sentences:
+            return []
+
+        n_tags = len(TAGS)
+        lengths = np.array([len(s) for s in sentences])
+        batch, max_len = len(sentences), max(lengths.max(), 1)
+
+        emit = np.zeros((batch, max_len, n_tags))
+        for b, sentence in enumerate(sentences):
+            if sentence:
+                emit[b, :len(sentence)] = [self.emission(word) for word in sentence]
+        active = np.arange(max_len)[None, :] < lengths[:, None]
+
+        log_start, log_trans = self._log_params()
+        identity = np.broadcast_to(np.arange(n_tags), (batch, n_tags))
+
+        score = log_start + emit[:, 0]
+        backptr = np.empty((batch, max_len, n_tags), dtype=np.intp)
+        backptr[:, 0] = identity
+        for t in range(1, max_len):
+            # cand[b, i, j] = score[b, i] + log P(j | i)
+            cand = score[:, :, None] + log_trans[None, :, :]
+            best = cand.argmax(axis=1)
+            new_score = np.take_along_axis(cand, best[:, None, :], axis=1)[:, 0] + emit[:, t]
+            # Для закончившихся предложений путь не меняется
+            step = active[:, t, None]
+            score = np.where(step, new_score, score)
+            backptr[:, t] = np.where(step, best, identity)
+
+        path = np.empty((batch, max_len), dtype=np.intp)
+        path[:, -1] = score.argmax(axis=1)
+        rows = np.arange(batch)
+        for t in range(max_len - 1, 0, -1):
+            path[:, t - 1] = backptr[rows, t, path[:, t]]
+
+        return [[TAGS[i] for i in path[b, :lengths[b]]] for b in range(batch)]
+
+    def tag(self, sentence):
+        """Выбор разбора каждого слова предложения с учетом контекста."""
+        return self.tag_batch([sentence])[0]
+
+    def tag_batch(self, sentences):
+        """Разборы для пачки предложений."""
+        result = []
+        for sentence, tags in zip(sentences, self.viterbi_batch(sentences)):
+            analyses = []
+            for word, tag in zip(sentence, tags):
+                readings = self.candidates(normalize(word).rstrip('?'))
+                chosen = next((a for a in readings if a['pos'] == tag), None)
+                if chosen is None:
+                    chosen = {'pos': tag, 'features': {}}
+                analyses.append(chosen)
+            result.append(analyses)
+        return result
+
+
+def accuracy(pairs):
+    """Доля совпадений в парах (предсказание, эталон)."""
+    return sum(p == g for p, g in pairs) / len(pairs) if pairs else 0.0
+
+
+def evaluate(tagger, sentences, batch_size=256):
+    """Точность по токенам (отдельно для знакомых и незнакомых теггеру форм) и скорость."""
+    words = [[w for w, _ in s] for s in sentences]
+    flat_words = [w for s in words for w in s]
+    gold = [t for s in sentences for _, t in s]
+
+    start = time.perf_counter()
+    predicted = []
+    for i in range(0, len(words), batch_size):
+        for tags in tagger.viterbi_batch(words[i:i + batch_size]):
+            predicted.extend(tags)
+    elapsed = time.perf_counter() - start
+
+    # Знакомые формы угадываются по словарю, контекст важен для незнакомых
+    seen = [tagger.is_known(w) for w in flat_words]
+    pairs = list(zip(predicted, gold))
+    return {
+        'accuracy': accuracy(pairs),
+        'accuracy_seen': accuracy([p for p, known in zip(pairs, seen) if known]),
+        'accuracy_unseen': accuracy([p for p, known in zip(pairs, seen) if not known]),
+        'tokens_seen': sum(seen),
+        'tokens_unseen': len(seen) - sum(seen),
+        'sentences_per_sec': len(sentences) / elapsed if elapsed else float('inf'),
+        'tokens': len(gold),
+    }
+
+
+def make_synthetic_corpus(path='words.json', n_sentences=5000, seed=0, forms=None):
+    """Псевдопредложения из словаря по простым шаблонам (пока нет размеченного корпуса)."""
+    with open(path, encoding='utf-8') as f:
+        lexicon = json.load(f)
+
+    by_tag = {}
+    for form, entry in lexicon.items():
+        if ' ' not in form and (forms is None or form in forms):
+            by_tag.setdefault(entry['pos'].upper(), []).append(form)
+
+    templates = [
+        ('PRON', 'VERB'),
+        ('PRON', 'NOUN', 'VERB'),
+        ('NOUN', 'NOUN', 'VERB'),
+        ('NUM', 'NOUN', 'VERB'),
+        ('PRON', 'NUM', 'NOUN', 'VERB'),
+        ('NOUN', 'VERB'),
+    ]
+    rng = random.Random(seed)
+    return [[(rng.choice(by_tag[tag]), tag) for tag in rng.choice(templates)]
+            for _ in range(n_sentences)]
+
+
+if __name__ == "__main__":
+    tagger = HMMTagger()
+
+    if len(sys.argv) > 1:
+        corpus = load_tagged_corpus(sys.argv[1])
+        random.Random(0).shuffle(corpus)
+        split = int(len(corpus) * 0.8)
+        train, held_out = corpus[:split], corpus[split:]
+        tagger.seed_from_lexicon()
+    else:
+        # Часть словаря скрываем, чтобы проверить разбор незнакомых форм
+        with open('words.json', encoding='utf-8') as f:
+            forms = sorted(json.load(f))
+        known = set(random.Random(1).sample(forms, int(len(forms) * 0.7)))
+        train = make_synthetic_corpus(n_sentences=5000, seed=0, forms=known)
+        held_out = make_synthetic_corpus(n_sentences=1000, seed=1)
+        tagger.seed_from_lexicon(words=known)
+
+    tagger.train(train)
+
+    # Базовая линия: приоритетный выбор analyze() без контекста
+    gold = [(w, t) for s in held_out for w, t in s]
+    baseline = [(tagger.analyzer.analyze(w)['pos'], t) for w, t in gold]
+    seen = [tagger.is_known(w) for w, _ in gold]
+
+    stats = evaluate(tagger, held_out)
+    print(f"Предложений: обучение {len(train)}, контроль {len(held_out)}")
+    print(f"Слов на контроле: знакомых {stats['tokens_seen']}, незнакомых {stats['tokens_unseen']}")
+    print(f"{'':<14}{'все':>8}{'знакомые':>10}{'незнакомые':>12}")
+    print(f"{'analyze()':<14}{accuracy(baseline):>8.3f}"
+          f"{accuracy([p for p, k in zip(baseline, seen) if k]):>10.3f}"
+          f"{accuracy([p for p, k in zip(baseline, seen) if not k]):>12.3f}")
+    print(f"{'HMM':<14}{stats['accuracy']:>8.3f}{stats['accuracy_seen']:>10.3f}{stats['accuracy_unseen']:>12.3f}")
+    print(f"Скорость: {stats['sentences_per_sec']:.0f} предложений/с")